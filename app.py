@@ -2,13 +2,20 @@ from flask import Flask, render_template, request, jsonify, send_file
 import pandas as pd
 from datetime import datetime
 import folium
-import numpy as np
+from geo_utils import haversine_distance
 from packaging_predictor import PackagingPredictor
 from package_supply import WeatherBasedPackaging
+from request_profiler import RequestProfiler
+from route_optimizer import optimize_route
 import os
+import math
 
 app = Flask(__name__)
 
+# Opt-in request profiling (off unless LOGICORE_PROFILING=1 or enabled
+# through /admin/profiling)
+profiler = RequestProfiler.from_env(app)
+
 # Initialize predictors
 packaging_predictor = PackagingPredictor()
 weather_packaging = WeatherBasedPackaging()
@@ -16,17 +23,11 @@ weather_packaging = WeatherBasedPackaging()
 # Load redistribution centers data
 df = pd.read_csv('redistribution_center.txt')
 
-def haversine_distance(lat1, lon1, lat2, lon2):
-    # Convert latitude and longitude to radians
-    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-    c = 2 * np.arcsin(np.sqrt(a))
-    r = 6371  # Radius of Earth in kilometers
-    return c * r
+# The optimizer builds an (n + 2)^2 distance matrix per request and runs on
+# the request thread, so both the input size and the search time are capped
+MAX_ROUTE_STOPS = 2000
+DEFAULT_ROUTE_TIME_LIMIT = 2.0
+MAX_ROUTE_TIME_LIMIT = 10.0
 
 def find_nearest_center(user_lat, user_lon, centers_df):
     distances = centers_df.apply(
@@ -105,7 +106,11 @@ def predict_packaging():
         }
         
         result = packaging_predictor.predict(test_data)
-        return jsonify({'result': result['result']})
+        return jsonify({
+            'result': result['result'],
+            'prompt_tokens': result['prompt_tokens'],
+            'prefill_ms': result['prefill_ms']
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -134,7 +139,11 @@ def predict_test_package():
         {result['result']}
         """
         
-        return jsonify({'result': formatted_result})
+        return jsonify({
+            'result': formatted_result,
+            'prompt_tokens': result['prompt_tokens'],
+            'prefill_ms': result['prefill_ms']
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -198,5 +207,57 @@ def api_find_nearest_center():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+# Pickup Route Optimizer API
+@app.route('/api/optimize_route', methods=['POST'])
+def api_optimize_route():
+    try:
+        data = request.json
+        if not isinstance(data.get('stops'), list) or not data['stops']:
+            return jsonify({'error': 'stops must be a non-empty list'}), 400
+        if len(data['stops']) > MAX_ROUTE_STOPS:
+            return jsonify({'error': f'At most {MAX_ROUTE_STOPS} stops are supported'}), 400
+        
+        stops = [(float(stop['latitude']), float(stop['longitude'])) for stop in data['stops']]
+        start = data.get('start')
+        if start is not None:
+            start = (float(start['latitude']), float(start['longitude']))
+        points = stops + ([start] if start is not None else [])
+        if not all(math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90
+                   and -180 <= lon <= 180 for lat, lon in points):
+            return jsonify({'error': 'Invalid latitude or longitude'}), 400
+        time_limit = float(data.get('time_limit', DEFAULT_ROUTE_TIME_LIMIT))
+        if not math.isfinite(time_limit) or not 0 <= time_limit <= MAX_ROUTE_TIME_LIMIT:
+            return jsonify({'error': f'time_limit must be between 0 and {MAX_ROUTE_TIME_LIMIT} seconds'}), 400
+        
+        result = optimize_route(stops, df, start=start, time_limit=time_limit)
+        
+        # Full route in visiting order, ending at the chosen center
+        route = ([list(start)] if start is not None else []) \
+            + [list(stops[i]) for i in result['stop_order']] \
+            + [result['center_coordinates']]
+        result['route'] = route
+        
+        # Google Maps handles only a limited number of waypoints
+        if len(route) <= 10:
+            result['directions_url'] = "https://www.google.com/maps/dir/" + "/".join(
+                f"{lat},{lon}" for lat, lon in route
+            )
+        
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+# Profiling admin API
+@app.route('/admin/profiling', methods=['GET', 'POST'])
+def admin_profiling():
+    if not profiler.is_authorized(request.headers):
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        if request.method == 'POST':
+            profiler.configure(request.json or {})
+        return jsonify(profiler.status())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
 if __name__ == '__main__':
     app.run(debug=True,port=8001) 
\ No newline at end of file
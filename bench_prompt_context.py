@@ -0,0 +1,94 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from packaging_predictor import PackagingPredictor
+from prompt_context import estimate_tokens
+
+
+def extract_material(answer, materials):
+    # Pick the catalogue material mentioned earliest in the answer
+    # (longest name wins on ties so "Bubble Wrap + Box" beats "Box")
+    text = answer.lower()
+    best = None
+    for material in materials:
+        pos = text.find(material.lower())
+        if pos == -1:
+            continue
+        if best is None or (pos, -len(material)) < (best[0], -len(best[1])):
+            best = (pos, material)
+    return best[1] if best else None
+
+
+def run(predictor, samples, context_format):
+    rows = []
+    for _, test_data in samples.iterrows():
+        start = time.perf_counter()
+        result = predictor.predict(test_data, context_format=context_format)
+        rows.append({
+            "Product_ID": test_data["Product_ID"],
+            "answer": result["result"],
+            "estimated_prompt_tokens": result["estimated_prompt_tokens"],
+            "prompt_tokens": result["prompt_tokens"],
+            "prefill_ms": result["prefill_ms"],
+            "total_ms": (time.perf_counter() - start) * 1000,
+        })
+    return pd.DataFrame(rows)
+
+
+def summarize(name, results):
+    print(f"\n{name}:")
+    for column in ["estimated_prompt_tokens", "prompt_tokens", "prefill_ms", "total_ms"]:
+        values = results[column].dropna().astype(float)
+        if values.empty:
+            print(f"  {column:<24} n/a")
+            continue
+        print(f"  {column:<24} mean {values.mean():8.1f}  p50 {np.percentile(values, 50):8.1f}"
+              f"  p95 {np.percentile(values, 95):8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare verbose and compact retrieval prompts")
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--budget", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    catalogue = pd.read_csv("Product_Dataset.csv")
+    materials = sorted(catalogue["Packaging_Material"].unique())
+    samples = catalogue.sample(n=min(args.samples, len(catalogue)), random_state=args.seed)
+
+    predictor = PackagingPredictor(context_token_budget=args.budget, top_k=args.top_k)
+
+    # Show one rendered prompt of each kind for reference
+    first = samples.iloc[0]
+    for context_format in ["verbose", "compact"]:
+        _, _, prompt = predictor.build_prompt(first, context_format)
+        print(f"--- {context_format} prompt ({len(prompt)} chars, ~{estimate_tokens(prompt)} tokens) ---")
+        print(prompt)
+
+    # Warm the model so the first measured request does not pay the load time
+    predictor.llm.invoke("ok")
+
+    verbose = run(predictor, samples, "verbose")
+    compact = run(predictor, samples, "compact")
+    summarize("verbose (before)", verbose)
+    summarize("compact (after)", compact)
+
+    verbose_choice = verbose["answer"].apply(lambda a: extract_material(a, materials))
+    compact_choice = compact["answer"].apply(lambda a: extract_material(a, materials))
+    truth = samples["Packaging_Material"].reset_index(drop=True)
+    print("\nAnswer agreement:")
+    print(f"  compact vs verbose      {(verbose_choice == compact_choice).mean():.0%}")
+    print(f"  verbose vs catalogue    {(verbose_choice == truth).mean():.0%}")
+    print(f"  compact vs catalogue    {(compact_choice == truth).mean():.0%}")
+
+    speedup = verbose["prefill_ms"].dropna().mean() / compact["prefill_ms"].dropna().mean()
+    print(f"\nPrefill speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
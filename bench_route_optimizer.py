@@ -0,0 +1,57 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from route_optimizer import EXACT_STOPS, held_karp, optimize_route, path_length, route_distance_matrix
+
+# Rough bounding box around the Dubai service area
+LAT_RANGE = (25.05, 25.35)
+LON_RANGE = (55.10, 55.45)
+
+# Largest instance the exact reference is computed for
+REFERENCE_STOPS = 12
+
+
+def random_stops(n, rng):
+    return np.column_stack([rng.uniform(*LAT_RANGE, n), rng.uniform(*LON_RANGE, n)])
+
+
+def print_row(n, method, result, optimum):
+    gap = f"{result['total_distance'] / optimum - 1:+.2%}" if optimum is not None else ""
+    improvement = result['total_distance'] / result['constructed_distance'] - 1
+    print(f"{n:>6} {method:<13} {result['initial_distance']:>10.2f} {result['constructed_distance']:>10.2f} "
+          f"{result['total_distance']:>13.2f} {improvement:>+10.2%} {gap:>11} "
+          f"{result['runtime_ms']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solution quality and runtime of the pickup route optimizer")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--time-limit", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    centers_df = pd.read_csv('redistribution_center.txt')
+    rng = np.random.default_rng(args.seed)
+    start = (25.2048, 55.2708)
+
+    print(f"{'stops':>6} {'method':<13} {'input km':>10} {'greedy km':>10} {'optimized km':>13} "
+          f"{'vs greedy':>10} {'vs optimal':>11} {'runtime ms':>11}")
+    for n in args.sizes:
+        stops = random_stops(n, rng)
+        optimum = None
+        if n <= REFERENCE_STOPS:
+            dist, _ = route_distance_matrix(stops, centers_df, start)
+            optimum = path_length(dist, held_karp(dist))
+        result = optimize_route(stops, centers_df, start=start, time_limit=args.time_limit)
+        print_row(n, "default", result, optimum)
+        if n <= EXACT_STOPS:
+            # Solved exactly; also show what local search alone reaches
+            result = optimize_route(stops, centers_df, start=start, time_limit=args.time_limit,
+                                    exact_stops=0)
+            print_row(n, "local search", result, optimum)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from langchain_community.embeddings import OllamaEmbeddings
+from langchain.vectorstores import FAISS
+
+# Explicit dtypes so every chunk formats the same way (a chunk of whole
+# weights would otherwise parse as int and give "5 kg" instead of "5.0 kg")
+CATALOGUE_DTYPES = {
+    "Product_Type": str,
+    "Weight_kg": float,
+    "Fragile": str,
+    "Temp_Condition": str,
+    "Humidity_Level": str,
+    "Packaging_Material": str,
+}
+
+
+def format_product_contexts(df):
+    # Vectorized version of the per-row context strings; the text is kept
+    # identical to what earlier vector stores were built from
+    return (
+        "\n            Product Type: " + df["Product_Type"].astype(str)
+        + "\n            Weight: " + df["Weight_kg"].astype(str) + " kg"
+        + "\n            Fragile: " + df["Fragile"].astype(str)
+        + "\n            Temperature Condition: " + df["Temp_Condition"].astype(str)
+        + "\n            Humidity Level: " + df["Humidity_Level"].astype(str)
+        + "\n            Packaging Material: " + df["Packaging_Material"].astype(str)
+        + "\n            "
+    ).tolist()
+
+
+# Streams a catalogue CSV into a FAISS vector store: chunks are formatted,
+# embedded in batches on a bounded thread pool and appended in file order
+class CatalogueIngestor:
+    def __init__(self, embeddings, vector_store_path="vector_store", chunk_size=10000,
+                 batch_size=256, workers=4, max_in_flight=None, report_every=5.0):
+        self.embeddings = embeddings
+        self.vector_store_path = vector_store_path
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+        # Seconds between progress lines
+        self.report_every = report_every
+        self.vector_store = None
+        self.rows_done = 0
+
+    def batches(self, csv_path):
+        chunks = pd.read_csv(
+            csv_path, chunksize=self.chunk_size,
+            usecols=list(CATALOGUE_DTYPES), dtype=CATALOGUE_DTYPES
+        )
+        for chunk in chunks:
+            contexts = format_product_contexts(chunk)
+            for start in range(0, len(contexts), self.batch_size):
+                yield contexts[start:start + self.batch_size]
+
+    def embed_batch(self, texts):
+        return texts, self.embeddings.embed_documents(texts)
+
+    def add_batch(self, texts, vectors):
+        text_embeddings = list(zip(texts, vectors))
+        if self.vector_store is None:
+            self.vector_store = FAISS.from_embeddings(text_embeddings, self.embeddings)
+        else:
+            self.vector_store.add_embeddings(text_embeddings)
+        self.rows_done += len(texts)
+
+    def report(self, started, final=False):
+        elapsed = time.perf_counter() - started
+        rate = self.rows_done / elapsed if elapsed > 0 else 0.0
+        label = "Ingested" if final else "Ingesting..."
+        print(f"{label} {self.rows_done} rows in {elapsed:.1f}s ({rate:.0f} rows/sec)")
+
+    def run(self, csv_path):
+        started = time.perf_counter()
+        last_report = started
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for texts in self.batches(csv_path):
+                # Wait for the oldest batch before queueing more work
+                while len(pending) >= self.max_in_flight:
+                    self.add_batch(*pending.popleft().result())
+                pending.append(pool.submit(self.embed_batch, texts))
+                if time.perf_counter() - last_report >= self.report_every:
+                    self.report(started)
+                    last_report = time.perf_counter()
+            while pending:
+                self.add_batch(*pending.popleft().result())
+        if self.vector_store is None:
+            raise ValueError(f"No products found in {csv_path}")
+        self.vector_store.save_local(self.vector_store_path)
+        self.report(started, final=True)
+        return self.vector_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the product vector store from a catalogue CSV")
+    parser.add_argument("csv_path", nargs="?", default="Product_Dataset.csv")
+    parser.add_argument("--vector-store-path", default="vector_store")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-in-flight", type=int)
+    args = parser.parse_args()
+
+    ingestor = CatalogueIngestor(
+        OllamaEmbeddings(model="mxbai-embed-large"),
+        vector_store_path=args.vector_store_path,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+    )
+    ingestor.run(args.csv_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,29 @@ from langchain_community.embeddings import OllamaEmbeddings
 from langchain_community.llms import Ollama
 from langchain.vectorstores import FAISS
 from langchain.prompts import PromptTemplate
-from langchain.chains import RetrievalQA
 import os
+from catalogue_ingest import CatalogueIngestor, format_product_contexts
+from prompt_context import build_compact_context, compact_text, estimate_tokens
+
 
 class PackagingPredictor:
-    def __init__(self):
+    def __init__(self, context_format="compact", context_token_budget=384, top_k=4,
+                 weight_tolerance=0.5):
         # Initialize embedding model
         self.embeddings = OllamaEmbeddings(model="mxbai-embed-large")
         # Initialize LLM
         self.llm = Ollama(model="llama3.2")
         # Vector store path
         self.vector_store_path = "vector_store"
+        # "compact" sends a deduplicated neighbor table, "verbose" sends every
+        # retrieved document as stored (the original "stuff" chain prompt)
+        self.context_format = context_format
+        # Upper bound on the estimated prompt tokens for compact prompts
+        self.context_token_budget = context_token_budget
+        # Number of neighbors retrieved per query
+        self.top_k = top_k
+        # Relative weight difference under which neighbors are collapsed
+        self.weight_tolerance = weight_tolerance
         
         # Create prompt template
         self.prompt_template = PromptTemplate(
@@ -51,42 +63,33 @@ class PackagingPredictor:
             print("Creating new vector store...")
             self._create_vector_store()
             
-        # Create retrieval chain
-        self.qa_chain = RetrievalQA.from_chain_type(
-            llm=self.llm,
-            chain_type="stuff",
-            retriever=self.vector_store.as_retriever(),
-            return_source_documents=True,
-            chain_type_kwargs={"prompt": self.prompt_template}
+        # Same instructions as prompt_template without the indentation; the
+        # context is the compact neighbor table
+        self.compact_prompt_template = PromptTemplate(
+            input_variables=["context", "question"],
+            template=(
+                "Based on the following product information and similar products from our database, "
+                "determine the most appropriate packaging material and explain why.\n\n"
+                "Context (n = number of merged near-duplicates):\n{context}\n\n"
+                "Question:\n{question}\n\n"
+                "Please provide:\n"
+                "1. The recommended packaging material\n"
+                "2. A detailed explanation of why this packaging material is suitable"
+            )
         )
 
     def _create_vector_store(self):
-        # Load training data
-        df = pd.read_csv("Product_Dataset.csv")
-        # Prepare training contexts
-        contexts = self.prepare_training_data(df)
-        # Create and save vector store
-        self.vector_store = FAISS.from_texts(contexts, self.embeddings)
-        self.vector_store.save_local(self.vector_store_path)
+        # Stream the training data into a new vector store and save it
+        ingestor = CatalogueIngestor(self.embeddings, self.vector_store_path)
+        self.vector_store = ingestor.run("Product_Dataset.csv")
 
     def prepare_training_data(self, df):
         # Create context strings for each product
-        contexts = []
-        for _, row in df.iterrows():
-            context = f"""
-            Product Type: {row['Product_Type']}
-            Weight: {row['Weight_kg']} kg
-            Fragile: {row['Fragile']}
-            Temperature Condition: {row['Temp_Condition']}
-            Humidity Level: {row['Humidity_Level']}
-            Packaging Material: {row['Packaging_Material']}
-            """
-            contexts.append(context)
-        return contexts
+        return format_product_contexts(df)
 
-    def predict(self, test_data):
-        # Create query string
-        query = f"""
+    def build_query(self, test_data):
+        # Create query string; also used for retrieval in both context formats
+        return f"""
         Product Type: {test_data['Product_Type']}
         Weight: {test_data['Weight_kg']} kg
         Fragile: {test_data['Fragile']}
@@ -95,10 +98,43 @@ class PackagingPredictor:
         
         What is the most appropriate packaging material for this product?
         """
+
+    def build_prompt(self, test_data, context_format=None):
+        # Retrieve neighbors and render the prompt exactly as it will be sent.
+        # Retrieval is the same for both formats; only the rendering differs
+        context_format = context_format or self.context_format
+        query = self.build_query(test_data)
+        docs = self.vector_store.similarity_search(query, k=self.top_k)
+        if context_format == "verbose":
+            # Same layout the "stuff" chain produces
+            context = "\n\n".join(doc.page_content for doc in docs)
+            prompt = self.prompt_template.format(context=context, question=query)
+        elif context_format == "compact":
+            _, prompt = build_compact_context(
+                [doc.page_content for doc in docs], compact_text(query),
+                self.compact_prompt_template, self.context_token_budget, self.weight_tolerance
+            )
+        else:
+            raise ValueError(f"Unknown context format: {context_format}")
+        return query, docs, prompt
+
+    def predict(self, test_data, context_format=None):
+        query, docs, prompt = self.build_prompt(test_data, context_format)
         
         # Get prediction and reasoning
-        result = self.qa_chain({"query": query})
-        return result
+        response = self.llm.generate([prompt])
+        generation = response.generations[0][0]
+        info = generation.generation_info or {}
+        prefill_ns = info.get("prompt_eval_duration")
+        return {
+            "query": query,
+            "result": generation.text,
+            "source_documents": docs,
+            "estimated_prompt_tokens": estimate_tokens(prompt),
+            # Measured by Ollama for this request
+            "prompt_tokens": info.get("prompt_eval_count"),
+            "prefill_ms": prefill_ns / 1e6 if prefill_ns is not None else None,
+        }
 
 def main():
     # Initialize predictor
@@ -122,6 +158,7 @@ def main():
     
     print("\nPrediction and Reasoning:")
     print(result['result'])
+    print(f"\nPrompt tokens: {result['prompt_tokens']}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
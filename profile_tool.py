@@ -0,0 +1,166 @@
+import argparse
+import html
+import os
+import pstats
+import zlib
+from collections import Counter
+
+
+def load_folded(path):
+    # Folded stacks: "frame;frame;frame count" per line
+    stacks = Counter()
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            stack, _, count = line.rpartition(" ")
+            stacks[stack] += int(count)
+    return stacks
+
+
+def self_costs(path):
+    # Per-function self cost: sample share for folded stacks, tottime share
+    # for cProfile stats. Shares make profiles of different lengths comparable
+    costs = Counter()
+    if path.endswith(".folded"):
+        for stack, count in load_folded(path).items():
+            costs[stack.split(";")[-1]] += count
+    else:
+        stats = pstats.Stats(path)
+        for (filename, line, name), (_, _, tottime, _, _) in stats.stats.items():
+            costs[f"{name} ({os.path.basename(filename)}:{line})"] += tottime
+    total = sum(costs.values()) or 1
+    return {frame: cost / total for frame, cost in costs.items()}
+
+
+def build_tree(stacks):
+    root = {"name": "all", "value": 0, "children": {}}
+    for stack, count in stacks.items():
+        root["value"] += count
+        node = root
+        for frame in stack.split(";"):
+            child = node["children"].setdefault(frame, {"name": frame, "value": 0, "children": {}})
+            child["value"] += count
+            node = child
+    return root
+
+
+def render_flamegraph(stacks, title, width=1200, row_height=16):
+    root = build_tree(stacks)
+    rects = []
+
+    def layout(node, x, depth, scale):
+        rects.append((x, depth, node["value"] * scale, node))
+        offset = x
+        for child in sorted(node["children"].values(), key=lambda c: c["name"]):
+            layout(child, offset, depth + 1, scale)
+            offset += child["value"] * scale
+
+    total = root["value"] or 1
+    layout(root, 0, 0, width / total)
+    depth = max(d for _, d, _, _ in rects) + 1
+    height = depth * row_height + 40
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">',
+        f'<text x="4" y="16" font-size="14">{html.escape(title)}</text>',
+    ]
+    for x, d, w, node in rects:
+        if w < 0.5:
+            continue
+        # Root at the bottom, like a classic flame graph
+        y = height - (d + 1) * row_height
+        share = node["value"] / total
+        hue = 20 + (zlib.crc32(node["name"].encode()) % 40)
+        label = html.escape(node["name"])
+        parts.append(
+            f'<g><title>{label} ({node["value"]} samples, {share:.1%})</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" '
+            f'fill="hsl({hue},90%,60%)"/>'
+        )
+        max_chars = int(w / 7)
+        if max_chars >= 3:
+            text = node["name"] if len(node["name"]) <= max_chars else node["name"][:max_chars - 2] + ".."
+            parts.append(f'<text x="{x + 2:.1f}" y="{y + row_height - 4}">{html.escape(text)}</text>')
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def cmd_list(args):
+    if not os.path.isdir(args.profile_dir):
+        print(f"No profiles yet ({args.profile_dir} does not exist)")
+        return
+    names = sorted(n for n in os.listdir(args.profile_dir) if n.endswith((".prof", ".folded")))
+    for name in names:
+        size = os.path.getsize(os.path.join(args.profile_dir, name))
+        print(f"{name}  {size / 1024:.1f} KB")
+
+
+def cmd_show(args):
+    if args.profile.endswith(".prof"):
+        pstats.Stats(args.profile).sort_stats(args.sort).print_stats(args.limit)
+        return
+    costs = self_costs(args.profile)
+    for frame, share in sorted(costs.items(), key=lambda item: -item[1])[:args.limit]:
+        print(f"{share:7.1%}  {frame}")
+
+
+def cmd_flamegraph(args):
+    if not args.profile.endswith(".folded"):
+        raise SystemExit("Flame graphs need a sampled (.folded) profile; use 'show' for .prof files")
+    output = args.output or os.path.splitext(args.profile)[0] + ".svg"
+    with open(output, "w") as f:
+        f.write(render_flamegraph(load_folded(args.profile), os.path.basename(args.profile)))
+    print(f"Flame graph written to {output}")
+
+
+def cmd_diff(args):
+    # Sample shares and cProfile tottime shares measure different things
+    if os.path.splitext(args.before)[1] != os.path.splitext(args.after)[1]:
+        raise SystemExit("Both profiles must be of the same kind (.folded or .prof)")
+    before = self_costs(args.before)
+    after = self_costs(args.after)
+    frames = set(before) | set(after)
+    deltas = sorted(
+        ((after.get(f, 0) - before.get(f, 0), f) for f in frames),
+        key=lambda item: -abs(item[0])
+    )
+    print(f"{'before':>8} {'after':>8} {'delta':>8}  function")
+    for delta, frame in deltas[:args.limit]:
+        print(f"{before.get(frame, 0):8.1%} {after.get(frame, 0):8.1%} {delta:+8.1%}  {frame}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect request profiles captured by RequestProfiler")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="List stored profiles")
+    list_parser.add_argument("--profile-dir", default="profiles")
+    list_parser.set_defaults(func=cmd_list)
+
+    show_parser = commands.add_parser("show", help="Print the most expensive functions")
+    show_parser.add_argument("profile")
+    show_parser.add_argument("--limit", type=int, default=25)
+    show_parser.add_argument("--sort", default="cumulative", help="pstats sort key for .prof files")
+    show_parser.set_defaults(func=cmd_show)
+
+    flame_parser = commands.add_parser("flamegraph", help="Render a sampled profile as an SVG flame graph")
+    flame_parser.add_argument("profile")
+    flame_parser.add_argument("-o", "--output")
+    flame_parser.set_defaults(func=cmd_flamegraph)
+
+    diff_parser = commands.add_parser("diff", help="Compare self cost per function between two profiles")
+    diff_parser.add_argument("before")
+    diff_parser.add_argument("after")
+    diff_parser.add_argument("--limit", type=int, default=25)
+    diff_parser.set_defaults(func=cmd_diff)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Fields stored in each product context, in the order they appear in the
+# compact neighbor table: (context label, table column)
+CONTEXT_FIELDS = [
+    ("Product Type", "Type"),
+    ("Weight", "Weight kg"),
+    ("Fragile", "Fragile"),
+    ("Temperature Condition", "Temp"),
+    ("Humidity Level", "Humidity"),
+    ("Packaging Material", "Packaging"),
+]
+
+
+def estimate_tokens(text):
+    # Rough prompt size used to enforce the token budget before the request is
+    # sent; the measured count comes back from Ollama as prompt_eval_count
+    return len(text) // 4 + 1
+
+
+def parse_context(text):
+    # Turn a stored "Label: value" context string back into a field dict
+    fields = {}
+    for line in text.strip().splitlines():
+        label, sep, value = line.strip().partition(":")
+        if sep:
+            fields[label.strip()] = value.strip()
+    weight = fields.get("Weight", "").replace("kg", "").strip()
+    try:
+        fields["Weight"] = float(weight)
+    except ValueError:
+        fields["Weight"] = None
+    return fields
+
+
+def collapse_neighbors(neighbors, weight_tolerance=0.5):
+    # Merge neighbors that share every categorical field and whose weights are
+    # within weight_tolerance (relative) of the first row of the group.
+    # Retrieval order is preserved by the first occurrence of each group.
+    groups = []
+    for fields in neighbors:
+        key = tuple(fields.get(label) for label, _ in CONTEXT_FIELDS if label != "Weight")
+        weight = fields.get("Weight")
+        for group in groups:
+            if group["key"] != key:
+                continue
+            base = group["weights"][0]
+            if weight is None or base is None:
+                close = weight is None and base is None
+            else:
+                close = abs(weight - base) <= weight_tolerance * abs(base)
+            if close:
+                group["weights"].append(weight)
+                break
+        else:
+            groups.append({"key": key, "fields": fields, "weights": [weight]})
+    return groups
+
+
+def format_neighbor_row(group):
+    weights = [w for w in group["weights"] if w is not None]
+    if not weights:
+        weight = "?"
+    elif min(weights) == max(weights):
+        weight = f"{weights[0]:g}"
+    else:
+        weight = f"{min(weights):g}-{max(weights):g}"
+    cells = []
+    for label, _ in CONTEXT_FIELDS:
+        cells.append(weight if label == "Weight" else str(group["fields"].get(label, "?")))
+    cells.append(str(len(group["weights"])))
+    return " | ".join(cells)
+
+
+def compact_text(text):
+    # Drop the indentation and blank lines the prompt strings are written with
+    return "\n".join(line.strip() for line in text.strip().splitlines() if line.strip())
+
+
+def build_compact_context(contexts, question, prompt_template, token_budget, weight_tolerance=0.5):
+    # Deduplicated table of neighbors, trimmed from the least similar end
+    # until the whole prompt fits the token budget (at least one row stays)
+    groups = collapse_neighbors([parse_context(text) for text in contexts], weight_tolerance)
+    header = " | ".join([column for _, column in CONTEXT_FIELDS] + ["n"])
+    rows = [format_neighbor_row(group) for group in groups]
+    while True:
+        context = "\n".join([header] + rows)
+        prompt = prompt_template.format(context=context, question=question)
+        if len(rows) <= 1 or estimate_tokens(prompt) <= token_budget:
+            return context, prompt
+        rows.pop()
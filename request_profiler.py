@@ -0,0 +1,258 @@
+import cProfile
+import fnmatch
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+
+class ProfiledResponse:
+    # Passes the response body through unbuffered and finishes the profile
+    # when the server closes the response
+    def __init__(self, iterable, on_close):
+        self.iterable = iterable
+        self.on_close = on_close
+
+    def __iter__(self):
+        return iter(self.iterable)
+
+    def close(self):
+        try:
+            if hasattr(self.iterable, "close"):
+                self.iterable.close()
+        finally:
+            self.on_close()
+
+
+# Opt-in per-route profiling. While disabled the app's own wsgi_app is left
+# in place; profiles are sampled stacks (.folded) or cProfile stats (.prof)
+# written to profile_dir, see profile_tool.py
+class RequestProfiler:
+    HEADER = "X-Profile-Request"
+    TOKEN_HEADER = "X-Profile-Token"
+    MODES = ("sample", "cprofile")
+
+    def __init__(self, app, enabled=False, routes=None, sample_rate=0.0, mode="sample",
+                 interval=0.005, profile_dir="profiles", max_profiles=200,
+                 max_age_hours=24.0, token=None):
+        self.app = app
+        self.original_wsgi_app = app.wsgi_app
+        self.routes = self.check_routes(routes or ["/api/*"])
+        self.sample_rate = self.check_sample_rate(sample_rate)
+        self.mode = self.check_mode(mode)
+        self.interval = self.check_interval(interval)
+        self.profile_dir = profile_dir
+        self.max_profiles = self.check_max_profiles(max_profiles)
+        self.max_age_hours = self.check_max_age_hours(max_age_hours)
+        self.token = token
+        self.enabled = False
+        # cProfile can only be active once per process and on 3.12+ it records
+        # every thread, so concurrent requests end up in the same .prof file
+        self._cprofile_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        if enabled:
+            self.enable()
+
+    @classmethod
+    def from_env(cls, app):
+        # LOGICORE_PROFILING=1 enables the hook at startup; everything else
+        # can also be changed later through the admin endpoint
+        routes = os.environ.get("LOGICORE_PROFILE_ROUTES")
+        return cls(
+            app,
+            enabled=os.environ.get("LOGICORE_PROFILING", "0") == "1",
+            routes=[r.strip() for r in routes.split(",")] if routes else None,
+            sample_rate=float(os.environ.get("LOGICORE_PROFILE_SAMPLE_RATE", "0")),
+            mode=os.environ.get("LOGICORE_PROFILE_MODE", "sample"),
+            profile_dir=os.environ.get("LOGICORE_PROFILE_DIR", "profiles"),
+            max_profiles=int(os.environ.get("LOGICORE_PROFILE_MAX_FILES", "200")),
+            max_age_hours=float(os.environ.get("LOGICORE_PROFILE_MAX_AGE_HOURS", "24")),
+            token=os.environ.get("LOGICORE_PROFILE_TOKEN") or None,
+        )
+
+    def enable(self):
+        self.app.wsgi_app = self
+        self.enabled = True
+
+    def disable(self):
+        self.app.wsgi_app = self.original_wsgi_app
+        self.enabled = False
+
+    def check_routes(self, routes):
+        if not isinstance(routes, list) or not all(isinstance(r, str) and r for r in routes):
+            raise ValueError("routes must be a list of route patterns")
+        return list(routes)
+
+    def check_sample_rate(self, sample_rate):
+        sample_rate = float(sample_rate)
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        return sample_rate
+
+    def check_interval(self, interval):
+        interval = float(interval)
+        if not interval > 0:
+            raise ValueError("interval must be greater than 0")
+        return interval
+
+    def check_max_profiles(self, max_profiles):
+        if isinstance(max_profiles, bool) or not isinstance(max_profiles, int) or max_profiles < 1:
+            raise ValueError("max_profiles must be a positive integer")
+        return int(max_profiles)
+
+    def check_max_age_hours(self, max_age_hours):
+        max_age_hours = float(max_age_hours)
+        if not max_age_hours > 0:
+            raise ValueError("max_age_hours must be greater than 0")
+        return max_age_hours
+
+    def check_mode(self, mode):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        return mode
+
+    def configure(self, settings):
+        # Apply settings posted to the admin endpoint; everything is checked
+        # before anything changes
+        mode = self.check_mode(settings.get("mode", self.mode))
+        routes = self.check_routes(settings.get("routes", self.routes))
+        sample_rate = self.check_sample_rate(settings.get("sample_rate", self.sample_rate))
+        interval = self.check_interval(settings.get("interval", self.interval))
+        if "enabled" in settings and not isinstance(settings["enabled"], bool):
+            raise ValueError("enabled must be true or false")
+        self.mode, self.routes = mode, routes
+        self.sample_rate, self.interval = sample_rate, interval
+        if "enabled" in settings:
+            if settings["enabled"]:
+                self.enable()
+            else:
+                self.disable()
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "mode": self.mode,
+            "routes": self.routes,
+            "sample_rate": self.sample_rate,
+            "interval": self.interval,
+            "profile_dir": self.profile_dir,
+            "profiles": self.list_profiles(),
+        }
+
+    def check_token(self, value):
+        # Constant-time comparison against the configured token
+        if self.token is None or value is None:
+            return False
+        return hmac.compare_digest(value.encode(), self.token.encode())
+
+    def is_authorized(self, headers):
+        return self.check_token(headers.get(self.TOKEN_HEADER))
+
+    def should_profile(self, environ):
+        path = environ.get("PATH_INFO", "")
+        if not any(fnmatch.fnmatch(path, pattern) for pattern in self.routes):
+            return False
+        requested = environ.get("HTTP_" + self.HEADER.upper().replace("-", "_"))
+        if self.check_token(requested):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, environ, start_response):
+        if not self.should_profile(environ):
+            return self.original_wsgi_app(environ, start_response)
+        if self.mode == "cprofile":
+            return self._run_cprofile(environ, start_response)
+        return self._run_sampled(environ, start_response)
+
+    def _run_cprofile(self, environ, start_response):
+        if not self._cprofile_lock.acquire(blocking=False):
+            # Another request is already being profiled
+            return self.original_wsgi_app(environ, start_response)
+        profiler = cProfile.Profile()
+
+        def finish(elapsed_ms):
+            profiler.disable()
+            self._cprofile_lock.release()
+            if elapsed_ms is not None:
+                profiler.dump_stats(self._profile_path(environ, elapsed_ms, "prof"))
+                self.prune()
+
+        profiler.enable()
+        return self._profile_response(environ, start_response, finish)
+
+    def _run_sampled(self, environ, start_response):
+        stacks = Counter()
+        stop = threading.Event()
+        target = threading.get_ident()
+        sampler = threading.Thread(
+            target=self._sample, args=(target, stacks, stop), daemon=True
+        )
+
+        def finish(elapsed_ms):
+            stop.set()
+            sampler.join()
+            if elapsed_ms is not None:
+                with open(self._profile_path(environ, elapsed_ms, "folded"), "w") as f:
+                    for stack, count in stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+                self.prune()
+
+        sampler.start()
+        return self._profile_response(environ, start_response, finish)
+
+    def _profile_response(self, environ, start_response, finish):
+        # Run the view with profiling started; finish(elapsed_ms) runs once the
+        # body has been sent, or with None if the app raised
+        start = time.perf_counter()
+        try:
+            iterable = self.original_wsgi_app(environ, start_response)
+        except Exception:
+            finish(None)
+            raise
+        return ProfiledResponse(
+            iterable, lambda: finish((time.perf_counter() - start) * 1000)
+        )
+
+    def _sample(self, target, stacks, stop):
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if frames:
+                stacks[";".join(reversed(frames))] += 1
+
+    def _profile_path(self, environ, elapsed_ms, extension):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        route = environ.get("PATH_INFO", "").strip("/").replace("/", "_") or "root"
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = (f"{stamp}-{uuid.uuid4().hex[:6]}_{environ.get('REQUEST_METHOD', 'GET')}"
+                f"_{route}_{elapsed_ms:.0f}ms.{extension}")
+        return os.path.join(self.profile_dir, name)
+
+    def list_profiles(self):
+        if not os.path.isdir(self.profile_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.profile_dir)
+            if name.endswith((".prof", ".folded"))
+        )
+
+    def prune(self):
+        # Keep at most max_profiles files, none older than max_age_hours
+        with self._write_lock:
+            cutoff = time.time() - self.max_age_hours * 3600
+            paths = [os.path.join(self.profile_dir, name) for name in self.list_profiles()]
+            paths.sort(key=os.path.getmtime, reverse=True)
+            for index, path in enumerate(paths):
+                if index >= self.max_profiles or os.path.getmtime(path) < cutoff:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
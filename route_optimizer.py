@@ -0,0 +1,191 @@
+import time
+
+import numpy as np
+
+from geo_utils import haversine_distance
+
+# Routes with at most this many stops are solved exactly
+EXACT_STOPS = 10
+
+
+def distance_matrix(lats1, lons1, lats2, lons2):
+    # Pairwise haversine distances (km) between two sets of points
+    lats1, lons1 = np.asarray(lats1, dtype=float), np.asarray(lons1, dtype=float)
+    lats2, lons2 = np.asarray(lats2, dtype=float), np.asarray(lons2, dtype=float)
+    return haversine_distance(lats1[:, None], lons1[:, None], lats2[None, :], lons2[None, :])
+
+
+def path_length(dist, order):
+    order = np.asarray(order)
+    return float(dist[order[:-1], order[1:]].sum())
+
+
+def nearest_neighbor(dist, first):
+    # Greedy construction over nodes 1..n-2 (0 is the start, n-1 the end),
+    # beginning with the given first stop
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    visited[[0, n - 1, first]] = True
+    order = [0, first]
+    for _ in range(n - 3):
+        costs = np.where(visited, np.inf, dist[order[-1]])
+        nxt = int(np.argmin(costs))
+        visited[nxt] = True
+        order.append(nxt)
+    order.append(n - 1)
+    return np.array(order)
+
+
+def held_karp(dist):
+    # Exact shortest path from node 0 through every stop to the end node, for
+    # instances small enough to enumerate subsets. best[mask, k] is the
+    # shortest path over the stops in mask ending at stop k
+    n = len(dist) - 2
+    stop_dist = dist[1:-1, 1:-1]
+    best = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=int)
+    for k in range(n):
+        best[1 << k, k] = dist[0, k + 1]
+    bits = 1 << np.arange(n)
+    for mask in range(1, 1 << n):
+        outside = np.flatnonzero((mask & bits) == 0)
+        if len(outside) == 0:
+            continue
+        # Each (mask | k, k) is only reachable from this mask, so no min needed
+        candidates = best[mask][:, None] + stop_dist[:, outside]
+        last = np.argmin(candidates, axis=0)
+        best[mask | bits[outside], outside] = candidates[last, np.arange(len(outside))]
+        parent[mask | bits[outside], outside] = last
+    mask = (1 << n) - 1
+    k = int(np.argmin(best[mask] + dist[1:-1, -1]))
+    path = []
+    while k >= 0:
+        path.append(k + 1)
+        mask, k = mask ^ (1 << k), int(parent[mask, k])
+    return np.array([0] + path[::-1] + [n + 1])
+
+
+def two_opt(dist, order, deadline=None):
+    # Reverse order[i..j] whenever that shortens the path; both ends stay fixed.
+    # Deltas for all j are computed at once for each i
+    n = len(order)
+    improved = False
+    for i in range(1, n - 2):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        a, b = order[i - 1], order[i]
+        c = order[i + 1:n - 1]
+        d = order[i + 2:n]
+        delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+        k = int(np.argmin(delta))
+        if delta[k] < -1e-9:
+            j = i + 1 + k
+            order[i:j + 1] = order[i:j + 1][::-1].copy()
+            improved = True
+    return improved
+
+
+def or_opt(dist, order, max_segment=3, deadline=None):
+    # Move segments of 1..max_segment stops (optionally reversed) to the best
+    # position elsewhere in the path
+    improved = False
+    for length in range(1, max_segment + 1):
+        i = 1
+        while i + length < len(order):
+            if deadline is not None and time.perf_counter() > deadline:
+                return improved
+            seg = order[i:i + length]
+            prev, nxt = order[i - 1], order[i + length]
+            removed = dist[prev, seg[0]] + dist[seg[-1], nxt] - dist[prev, nxt]
+            rest = np.concatenate([order[:i], order[i + length:]])
+            x, y = rest[:-1], rest[1:]
+            forward = dist[x, seg[0]] + dist[seg[-1], y] - dist[x, y]
+            backward = dist[x, seg[-1]] + dist[seg[0], y] - dist[x, y]
+            # Reinserting where the segment came from is not a move
+            forward[i - 1] = backward[i - 1] = np.inf
+            best_forward, best_backward = int(np.argmin(forward)), int(np.argmin(backward))
+            if forward[best_forward] <= backward[best_backward]:
+                p, gain, new_seg = best_forward, forward[best_forward], seg
+            else:
+                p, gain, new_seg = best_backward, backward[best_backward], seg[::-1]
+            if gain - removed < -1e-9:
+                order[:] = np.concatenate([rest[:p + 1], new_seg, rest[p + 1:]])
+                improved = True
+            else:
+                i += 1
+    return improved
+
+
+def route_distance_matrix(stops, centers_df, start=None):
+    # Node 0 is the start, 1..n the stops and n + 1 a virtual end whose
+    # distance from each stop is the distance to its closest center. Without
+    # a start, node 0 is zero distance from every stop. Also returns the
+    # closest center for each stop
+    stops = np.asarray(stops, dtype=float).reshape(-1, 2)
+    center_lats = centers_df['latitude'].to_numpy(dtype=float)
+    center_lons = centers_df['longitude'].to_numpy(dtype=float)
+    stop_to_center = distance_matrix(stops[:, 0], stops[:, 1], center_lats, center_lons)
+
+    size = len(stops) + 2
+    dist = np.zeros((size, size))
+    dist[1:-1, 1:-1] = distance_matrix(stops[:, 0], stops[:, 1], stops[:, 0], stops[:, 1])
+    dist[1:-1, -1] = dist[-1, 1:-1] = stop_to_center.min(axis=1)
+    if start is not None:
+        start_dist = distance_matrix([start[0]], [start[1]], stops[:, 0], stops[:, 1])[0]
+        dist[0, 1:-1] = dist[1:-1, 0] = start_dist
+    return dist, stop_to_center.argmin(axis=1)
+
+
+def optimize_route(stops, centers_df, start=None, time_limit=None, max_segment=3,
+                   exact_stops=EXACT_STOPS):
+    # Visit every stop once, starting at start (or the best stop when there is
+    # none), and end at the center closest to the last stop. Up to exact_stops
+    # stops are solved exactly; larger routes improve a nearest-neighbor tour
+    # with 2-opt and Or-opt until nothing helps or time_limit seconds pass
+    started = time.perf_counter()
+    deadline = started + time_limit if time_limit is not None else None
+    stops = np.asarray(stops, dtype=float).reshape(-1, 2)
+    n_stops = len(stops)
+    if n_stops == 0:
+        raise ValueError("At least one stop is required")
+
+    dist, end_center = route_distance_matrix(stops, centers_df, start)
+    if start is not None:
+        first = 1 + int(np.argmin(dist[0, 1:-1]))
+    else:
+        # A free start costs nothing; begin with the stop farthest from any center
+        first = 1 + int(np.argmax(dist[1:-1, -1]))
+
+    initial = np.arange(n_stops + 2)
+    order = nearest_neighbor(dist, first)
+    constructed = path_length(dist, order)
+
+    iterations = 0
+    timed_out = False
+    if n_stops <= exact_stops:
+        order = held_karp(dist)
+    else:
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                timed_out = True
+                break
+            iterations += 1
+            improved = two_opt(dist, order, deadline)
+            improved = or_opt(dist, order, max_segment, deadline) or improved
+            if not improved:
+                break
+
+    stop_order = [int(node) - 1 for node in order[1:-1]]
+    last = stop_order[-1]
+    center = centers_df.iloc[int(end_center[last])]
+    return {
+        'stop_order': stop_order,
+        'end_center': center['center_name'],
+        'center_coordinates': [float(center['latitude']), float(center['longitude'])],
+        'total_distance': path_length(dist, order),
+        'initial_distance': path_length(dist, initial),
+        'constructed_distance': constructed,
+        'iterations': iterations,
+        'runtime_ms': (time.perf_counter() - started) * 1000,
+        'timed_out': timed_out,
+    }
@@ -1,6 +1,6 @@
 from flask import Flask, jsonify, request, render_template
 import pandas as pd
-import numpy as np
+from geo_utils import haversine_distance
 import folium
 
 app = Flask(__name__)
@@ -8,18 +8,6 @@ app = Flask(__name__)
 # Load the redistribution centers data
 df = pd.read_csv('redistribution_center.txt')
 
-def haversine_distance(lat1, lon1, lat2, lon2):
-    # Convert latitude and longitude to radians
-    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-    c = 2 * np.arcsin(np.sqrt(a))
-    r = 6371  # Radius of Earth in kilometers
-    return c * r
-
 def find_nearest_center(user_lat, user_lon, centers_df):
     distances = centers_df.apply(
         lambda row: haversine_distance(user_lat, user_lon, row['latitude'], row['longitude']),
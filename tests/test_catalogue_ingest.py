@@ -0,0 +1,46 @@
+import pandas as pd
+
+from catalogue_ingest import CatalogueIngestor
+
+CSV = """Product_ID,Product_Type,Weight_kg,Fragile,Packaging_Material,Temp_Condition,Humidity_Level
+1001,Electronics,1.2,Yes,Bubble Wrap + Box,Room Temp,Low
+1002,Fresh Produce,5.0,No,Foam Box + Ice Pack,Cold Chain,High
+1003,Furniture,5,No,Wooden Crate,Room Temp,Low
+1004,Books,3,No,Cardboard Box,Room Temp,Moderate
+1005,Wine,8.1,Yes,Sturdy Box,Cool,Moderate
+"""
+
+
+def iterrows_contexts(df):
+    # The original per-row formatting the vector store was built with
+    contexts = []
+    for _, row in df.iterrows():
+        context = f"""
+            Product Type: {row['Product_Type']}
+            Weight: {row['Weight_kg']} kg
+            Fragile: {row['Fragile']}
+            Temperature Condition: {row['Temp_Condition']}
+            Humidity Level: {row['Humidity_Level']}
+            Packaging Material: {row['Packaging_Material']}
+            """
+        contexts.append(context)
+    return contexts
+
+
+def test_batches_match_iterrows_formatting(tmp_path):
+    path = tmp_path / "catalogue.csv"
+    path.write_text(CSV)
+    # chunk_size=2 puts the whole-number weights 5 and 3 in a chunk of their own
+    ingestor = CatalogueIngestor(embeddings=None, chunk_size=2, batch_size=1)
+    batches = list(ingestor.batches(str(path)))
+    assert all(len(batch) == 1 for batch in batches)
+    texts = [text for batch in batches for text in batch]
+    assert texts == iterrows_contexts(pd.read_csv(path))
+    assert "Weight: 5.0 kg" in texts[2] and "Weight: 3.0 kg" in texts[3]
+
+
+def test_batches_split_chunks_by_batch_size(tmp_path):
+    path = tmp_path / "catalogue.csv"
+    path.write_text(CSV)
+    ingestor = CatalogueIngestor(embeddings=None, chunk_size=3, batch_size=2)
+    assert [len(batch) for batch in ingestor.batches(str(path))] == [2, 1, 2]
@@ -0,0 +1,104 @@
+from prompt_context import (
+    build_compact_context, collapse_neighbors, compact_text, estimate_tokens,
+    format_neighbor_row, parse_context,
+)
+
+TEMPLATE = "Context:\n{context}\n\nQuestion:\n{question}"
+
+
+def context(product_type="Electronics", weight="1.2", fragile="Yes", temp="Room Temp",
+            humidity="Low", material="Bubble Wrap + Box"):
+    # Same layout as the stored vector store documents
+    return f"""
+            Product Type: {product_type}
+            Weight: {weight} kg
+            Fragile: {fragile}
+            Temperature Condition: {temp}
+            Humidity Level: {humidity}
+            Packaging Material: {material}
+            """
+
+
+def test_parse_context():
+    fields = parse_context(context())
+    assert fields == {
+        "Product Type": "Electronics",
+        "Weight": 1.2,
+        "Fragile": "Yes",
+        "Temperature Condition": "Room Temp",
+        "Humidity Level": "Low",
+        "Packaging Material": "Bubble Wrap + Box",
+    }
+
+
+def test_parse_context_bad_weight():
+    assert parse_context(context(weight="heavy"))["Weight"] is None
+
+
+def test_collapse_within_tolerance():
+    neighbors = [parse_context(context(weight=w)) for w in ["1.0", "1.4", "1.5"]]
+    groups = collapse_neighbors(neighbors, weight_tolerance=0.5)
+    assert [group["weights"] for group in groups] == [[1.0, 1.4, 1.5]]
+    assert format_neighbor_row(groups[0]) == "Electronics | 1-1.5 | Yes | Room Temp | Low | Bubble Wrap + Box | 3"
+
+
+def test_collapse_keeps_rows_outside_tolerance_apart():
+    neighbors = [parse_context(context(weight=w)) for w in ["1.0", "1.6"]]
+    groups = collapse_neighbors(neighbors, weight_tolerance=0.5)
+    assert [group["weights"] for group in groups] == [[1.0], [1.6]]
+
+
+def test_collapse_keeps_rows_with_other_fields_apart():
+    neighbors = [parse_context(context()), parse_context(context(fragile="No"))]
+    assert len(collapse_neighbors(neighbors)) == 2
+
+
+def test_collapse_preserves_retrieval_order():
+    neighbors = [
+        parse_context(context(product_type="Wine", material="Wooden Crate")),
+        parse_context(context()),
+        parse_context(context(product_type="Wine", material="Wooden Crate")),
+        parse_context(context(product_type="Books", material="Cardboard Box")),
+    ]
+    groups = collapse_neighbors(neighbors)
+    assert [group["fields"]["Product Type"] for group in groups] == ["Wine", "Electronics", "Books"]
+    assert [len(group["weights"]) for group in groups] == [2, 1, 1]
+
+
+def test_format_neighbor_row_single_and_unknown_weight():
+    groups = collapse_neighbors([parse_context(context(weight="5.0"))])
+    assert format_neighbor_row(groups[0]).split(" | ")[1] == "5"
+    groups = collapse_neighbors([parse_context(context(weight="?"))])
+    assert format_neighbor_row(groups[0]).split(" | ")[1] == "?"
+
+
+def test_compact_text():
+    assert compact_text("\n    a: 1\n\n    b: 2\n    ") == "a: 1\nb: 2"
+
+
+def contexts():
+    return [context(product_type=name) for name in ["Wine", "Books", "Toys", "Coffee"]]
+
+
+def test_budget_large_enough_keeps_every_row():
+    table, prompt = build_compact_context(contexts(), "Q", TEMPLATE, token_budget=10_000)
+    assert len(table.splitlines()) == 5
+    assert prompt == TEMPLATE.format(context=table, question="Q")
+
+
+def test_budget_drops_rows_from_the_tail():
+    full, full_prompt = build_compact_context(contexts(), "Q", TEMPLATE, token_budget=10_000)
+    budget = estimate_tokens(full_prompt) - 1
+    table, prompt = build_compact_context(contexts(), "Q", TEMPLATE, token_budget=budget)
+    rows = table.splitlines()[1:]
+    assert 1 <= len(rows) < 4
+    assert estimate_tokens(prompt) <= budget
+    assert rows == full.splitlines()[1:len(rows) + 1]
+    assert [row.split(" | ")[0] for row in rows] == ["Wine", "Books", "Toys"][:len(rows)]
+
+
+def test_budget_keeps_at_least_one_row():
+    table, _ = build_compact_context(contexts(), "Q", TEMPLATE, token_budget=1)
+    rows = table.splitlines()
+    assert rows[0].startswith("Type | Weight kg")
+    assert len(rows) == 2 and rows[1].startswith("Wine |")
@@ -0,0 +1,192 @@
+import argparse
+import os
+import time
+
+import pytest
+
+import profile_tool
+from request_profiler import ProfiledResponse, RequestProfiler
+
+
+class StubApp:
+    # Minimal stand-in for the Flask app: only wsgi_app is used
+    def __init__(self):
+        self.calls = 0
+
+        def wsgi_app(environ, start_response):
+            self.calls += 1
+            start_response("200 OK", [])
+            return [b"ok"]
+
+        self.wsgi_app = wsgi_app
+
+
+def environ(path="/api/find_nearest_center", token=None):
+    env = {"PATH_INFO": path, "REQUEST_METHOD": "POST"}
+    if token is not None:
+        env["HTTP_X_PROFILE_REQUEST"] = token
+    return env
+
+
+def call(app, env):
+    response = app.wsgi_app(env, lambda *args: None)
+    body = list(response)
+    if hasattr(response, "close"):
+        response.close()
+    return body
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return RequestProfiler(StubApp(), profile_dir=str(tmp_path), token="secret")
+
+
+def test_enable_and_disable_swap_wsgi_app(profiler):
+    original = profiler.app.wsgi_app
+    profiler.enable()
+    assert profiler.app.wsgi_app is profiler
+    profiler.disable()
+    assert profiler.app.wsgi_app is original
+
+
+def test_disabled_by_default(profiler):
+    assert not profiler.enabled
+    assert call(profiler.app, environ(token="secret")) == [b"ok"]
+    assert profiler.list_profiles() == []
+
+
+def test_header_token_triggers_profile(profiler):
+    profiler.enable()
+    assert call(profiler.app, environ(token="secret")) == [b"ok"]
+    [name] = profiler.list_profiles()
+    assert "_POST_api_find_nearest_center_" in name and name.endswith(".folded")
+
+
+def test_wrong_token_or_route_is_not_profiled(profiler):
+    profiler.enable()
+    call(profiler.app, environ(token="wrong"))
+    call(profiler.app, environ(path="/package_supply", token="secret"))
+    assert profiler.list_profiles() == []
+    assert profiler.app.calls == 2
+
+
+def test_sample_rate_triggers_profile(profiler):
+    profiler.configure({"enabled": True, "sample_rate": 1.0})
+    call(profiler.app, environ())
+    assert len(profiler.list_profiles()) == 1
+
+
+def test_route_patterns(profiler):
+    profiler.configure({"routes": ["/api/generate_*"]})
+    assert profiler.should_profile(environ("/api/generate_packaging_list", token="secret"))
+    assert not profiler.should_profile(environ("/api/find_nearest_center", token="secret"))
+
+
+def test_cprofile_mode(profiler):
+    profiler.configure({"enabled": True, "mode": "cprofile"})
+    call(profiler.app, environ(token="secret"))
+    assert [name.rsplit(".", 1)[1] for name in profiler.list_profiles()] == ["prof"]
+    assert not profiler._cprofile_lock.locked()
+
+
+def test_response_is_streamed_not_buffered(profiler):
+    profiler.enable()
+    response = profiler.app.wsgi_app(environ(token="secret"), lambda *args: None)
+    assert isinstance(response, ProfiledResponse)
+    # The profile is only written once the server closes the response
+    assert profiler.list_profiles() == []
+    list(response)
+    response.close()
+    assert len(profiler.list_profiles()) == 1
+
+
+def test_token_checks(profiler):
+    assert profiler.is_authorized({"X-Profile-Token": "secret"})
+    assert not profiler.is_authorized({"X-Profile-Token": "secre"})
+    assert not profiler.is_authorized({})
+    profiler.token = None
+    assert not profiler.is_authorized({"X-Profile-Token": "secret"})
+    assert not profiler.should_profile(environ(token="secret"))
+
+
+@pytest.mark.parametrize("settings", [
+    {"routes": "/api/*"},
+    {"routes": [""]},
+    {"routes": [1]},
+    {"sample_rate": 1.5},
+    {"sample_rate": -0.1},
+    {"sample_rate": "nan"},
+    {"interval": 0},
+    {"interval": -1},
+    {"mode": "trace"},
+    {"enabled": "false"},
+    {"enabled": 1},
+])
+def test_bad_settings_are_rejected(profiler, settings):
+    before = profiler.status()
+    with pytest.raises(ValueError):
+        profiler.configure(settings)
+    assert profiler.status() == before
+    assert not profiler.enabled
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"interval": 0},
+    {"sample_rate": 2},
+    {"max_profiles": 0},
+    {"max_profiles": -5},
+    {"max_age_hours": 0},
+    {"routes": "/api/*"},
+])
+def test_bad_constructor_values_are_rejected(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        RequestProfiler(StubApp(), profile_dir=str(tmp_path), **kwargs)
+
+
+def test_bad_env_values_are_rejected(monkeypatch):
+    monkeypatch.setenv("LOGICORE_PROFILE_MAX_FILES", "0")
+    with pytest.raises(ValueError):
+        RequestProfiler.from_env(StubApp())
+
+
+def test_prune_keeps_newest_profiles(tmp_path):
+    profiler = RequestProfiler(StubApp(), profile_dir=str(tmp_path), max_profiles=2)
+    for index in range(4):
+        path = tmp_path / f"profile{index}.folded"
+        path.write_text("main 1\n")
+        os.utime(path, (time.time() - 100 + index, time.time() - 100 + index))
+    profiler.prune()
+    assert profiler.list_profiles() == ["profile2.folded", "profile3.folded"]
+
+
+def test_prune_drops_old_profiles(tmp_path):
+    profiler = RequestProfiler(StubApp(), profile_dir=str(tmp_path), max_age_hours=1)
+    old, new = tmp_path / "old.prof", tmp_path / "new.prof"
+    old.write_text("")
+    new.write_text("")
+    os.utime(old, (time.time() - 7200, time.time() - 7200))
+    profiler.prune()
+    assert profiler.list_profiles() == ["new.prof"]
+
+
+def test_profile_tool_list_without_directory(tmp_path, capsys):
+    profile_tool.cmd_list(argparse.Namespace(profile_dir=str(tmp_path / "missing")))
+    assert "No profiles yet" in capsys.readouterr().out
+
+
+def test_profile_tool_diff_rejects_mixed_kinds(tmp_path):
+    folded = tmp_path / "a.folded"
+    folded.write_text("main;work 3\n")
+    args = argparse.Namespace(before=str(folded), after=str(tmp_path / "b.prof"), limit=5)
+    with pytest.raises(SystemExit):
+        profile_tool.cmd_diff(args)
+
+
+def test_profile_tool_diff_folded(tmp_path, capsys):
+    before, after = tmp_path / "a.folded", tmp_path / "b.folded"
+    before.write_text("main;work 3\nmain;idle 1\n")
+    after.write_text("main;work 1\nmain;idle 1\n")
+    profile_tool.cmd_diff(argparse.Namespace(before=str(before), after=str(after), limit=5))
+    out = capsys.readouterr().out
+    assert "-25.0%  work" in out
+    assert "+25.0%  idle" in out
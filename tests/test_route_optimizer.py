@@ -0,0 +1,131 @@
+from itertools import permutations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from geo_utils import haversine_distance
+from route_optimizer import (
+    distance_matrix, held_karp, optimize_route, path_length, route_distance_matrix,
+)
+
+CENTERS = pd.DataFrame({
+    'center_name': ['Dafz', 'Mirdif', 'Dubai Mall'],
+    'latitude': [25.256076, 25.217187, 25.198515],
+    'longitude': [55.376633, 55.407012, 55.278802],
+})
+START = (25.2048, 55.2708)
+
+
+def random_stops(n, rng):
+    return np.column_stack([rng.uniform(25.05, 25.35, n), rng.uniform(55.10, 55.45, n)])
+
+
+def brute_force_length(stops, start=None):
+    # Shortest route over every visiting order, independent of the optimizer
+    end_cost = distance_matrix(
+        stops[:, 0], stops[:, 1], CENTERS['latitude'], CENTERS['longitude']
+    ).min(axis=1)
+    dist = distance_matrix(stops[:, 0], stops[:, 1], stops[:, 0], stops[:, 1])
+    if start is not None:
+        start_cost = distance_matrix([start[0]], [start[1]], stops[:, 0], stops[:, 1])[0]
+    else:
+        start_cost = np.zeros(len(stops))
+    best = np.inf
+    for order in permutations(range(len(stops))):
+        order = list(order)
+        length = start_cost[order[0]] + dist[order[:-1], order[1:]].sum() + end_cost[order[-1]]
+        best = min(best, length)
+    return best
+
+
+def route_length(stops, result, start=None):
+    # Recompute the reported route from its stop order
+    points = ([start] if start is not None else []) + [tuple(stops[i]) for i in result['stop_order']]
+    points.append(tuple(result['center_coordinates']))
+    return sum(
+        haversine_distance(a[0], a[1], b[0], b[1]) for a, b in zip(points[:-1], points[1:])
+    )
+
+
+def test_distance_matrix_matches_haversine():
+    stops = random_stops(5, np.random.default_rng(0))
+    dist = distance_matrix(stops[:, 0], stops[:, 1], stops[:, 0], stops[:, 1])
+    assert dist.shape == (5, 5)
+    assert dist[1, 3] == pytest.approx(haversine_distance(*stops[1], *stops[3]))
+    assert np.allclose(np.diag(dist), 0)
+
+
+@pytest.mark.parametrize('n', [1, 2, 5, 30, 200])
+@pytest.mark.parametrize('start', [None, START])
+def test_result_is_permutation_of_stops(n, start):
+    stops = random_stops(n, np.random.default_rng(n))
+    result = optimize_route(stops, CENTERS, start=start)
+    assert sorted(result['stop_order']) == list(range(n))
+    assert result['total_distance'] == pytest.approx(route_length(stops, result, start))
+
+
+def test_single_stop():
+    stops = [(25.23, 55.39)]
+    result = optimize_route(stops, CENTERS, start=START)
+    assert result['stop_order'] == [0]
+    assert result['end_center'] == 'Mirdif'
+    expected = haversine_distance(*START, *stops[0]) + haversine_distance(25.23, 55.39, 25.217187, 55.407012)
+    assert result['total_distance'] == pytest.approx(expected)
+
+
+def test_two_stops():
+    # From the start near Dubai Mall, collect the nearby stop first and finish
+    # at the stop next to Dafz
+    stops = [(25.25, 55.37), (25.20, 55.28)]
+    result = optimize_route(stops, CENTERS, start=START)
+    assert result['stop_order'] == [1, 0]
+    assert result['end_center'] == 'Dafz'
+
+
+@pytest.mark.parametrize('exact_stops', [0, 10])
+def test_never_worse_than_nearest_neighbor(exact_stops):
+    rng = np.random.default_rng(1)
+    for n in [8, 50, 150]:
+        result = optimize_route(random_stops(n, rng), CENTERS, start=START, exact_stops=exact_stops)
+        assert result['total_distance'] <= result['constructed_distance'] + 1e-9
+
+
+def test_time_limit_still_returns_a_full_route():
+    stops = random_stops(300, np.random.default_rng(2))
+    result = optimize_route(stops, CENTERS, start=START, time_limit=0)
+    assert result['timed_out']
+    assert sorted(result['stop_order']) == list(range(300))
+    assert result['total_distance'] <= result['constructed_distance'] + 1e-9
+
+
+@pytest.mark.parametrize('n', [3, 5, 7])
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('start', [None, START])
+def test_held_karp_matches_brute_force(n, seed, start):
+    stops = random_stops(n, np.random.default_rng(seed))
+    dist, _ = route_distance_matrix(stops, CENTERS, start)
+    order = held_karp(dist)
+    assert sorted(order[1:-1]) == list(range(1, n + 1))
+    assert path_length(dist, order) == pytest.approx(brute_force_length(stops, start))
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('start', [None, START])
+def test_matches_optimum_on_small_instances(seed, start):
+    stops = random_stops(7, np.random.default_rng(seed))
+    result = optimize_route(stops, CENTERS, start=start)
+    assert result['total_distance'] == pytest.approx(brute_force_length(stops, start))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_local_search_close_to_optimum(seed):
+    # Local search alone (no exact solve) on instances brute force can check
+    stops = random_stops(7, np.random.default_rng(seed))
+    result = optimize_route(stops, CENTERS, start=START, exact_stops=0)
+    assert result['total_distance'] <= 1.1 * brute_force_length(stops, START)
+
+
+def test_empty_stops_rejected():
+    with pytest.raises(ValueError):
+        optimize_route([], CENTERS)